@@ -5,15 +5,84 @@ language models using LangChain’s `ChatGoogleGenerativeAI` interface.  It
 expects a valid API key in the ``GOOGLE_API_KEY`` environment variable or
 supplied via function parameters.  See the LangChain documentation for more
 details on available parameters【369091272480127†L449-L456】.
+
+Summaries are streamed token by token and cached in two tiers: an
+exact-match cache keyed by a hash of the text and a semantic cache that
+reuses the summary of a previously seen document whose embedding is nearly
+identical.  Only texts short enough to be embedded whole take part in the
+semantic tier.
 """
 
+import asyncio
+import hashlib
+import logging
+import math
 import os
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from langchain_core.prompts import ChatPromptTemplate
+
+logger = logging.getLogger(__name__)
+
+# Instructions go in the system message and the document in the human
+# message, so Gemini receives properly separated roles
+_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "You are a helpful assistant. Read the document text extracted with OCR "
+            "provided by the user and provide a concise summary highlighting the main "
+            "points. Be clear and coherent.",
+        ),
+        ("human", "Document text extracted with OCR :\n{text}"),
+    ]
+)
+
+_REDUCE_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "You are a helpful assistant. The user provides summaries of consecutive "
+            "parts of one document extracted with OCR. Combine them into a single "
+            "concise summary highlighting the main points. Be clear and coherent.",
+        ),
+        ("human", "Partial summaries :\n{text}"),
+    ]
+)
+
+# Longer texts are split into chunks of at most this many characters which are
+# summarised in parallel and then combined (map-reduce)
+_CHUNK_MAX_CHARS = 8000
+# Maximum number of concurrent Gemini requests; tune to the account's RPM quota
+_LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+
+# Exact-match cache: digest of the text -> (time stored, summary)
+_EXACT_CACHE_TTL = 3600
+_EXACT_CACHE_SIZE = 128
+_EXACT_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+# Cosine similarity above which a cached summary is reused for a new text
+_SIMILARITY_THRESHOLD = 0.95
+# Number of (embedding, summary) pairs kept by the semantic cache
+_SEMANTIC_CACHE_SIZE = 128
+# Only texts up to this length are embedded, whole, for the similarity
+# lookup; embedding a prefix would match documents that merely share it
+_EMBED_MAX_CHARS = 8000
+_SEMANTIC_CACHE: List[Tuple[List[float], str]] = []
+
+# Both caches are shared by every Streamlit session thread
+_CACHE_LOCK = threading.Lock()
+
+# Credentials are resolved once, when the module is imported
+_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 
+@lru_cache(maxsize=4)
 def _get_api_key(explicit_key : Optional[str] = None) -> str:
     """Return the Google API key from an explicit argument or environment.
 
@@ -21,14 +90,14 @@ def _get_api_key(explicit_key : Optional[str] = None) -> str:
     ----------
     explicit_key : str, optional
         API key provided directly by the caller.  If not provided, the
-        ``GOOGLE_API_KEY`` environment variable is checked.
+        ``GOOGLE_API_KEY`` environment variable read at import is used.
 
     Returns
     -------
     str
         The API key.  Raises ``ValueError`` if no key is available.
     """
-    api_key = YOUR_API_KEY  or os.getenv("GOOGLE_API_KEY")
+    api_key = explicit_key or _API_KEY
     if not api_key:
         raise ValueError(
             "No Google API key provided.  Set the GOOGLE_API_KEY environment variable"
@@ -36,12 +105,238 @@ def _get_api_key(explicit_key : Optional[str] = None) -> str:
     return api_key
 
 
-def summarize_text(text: str, *, api_key: Optional[str] = None) -> str:
+@lru_cache(maxsize=1)
+def _get_llm(api_key: str) -> ChatGoogleGenerativeAI:
+    """Return the Gemini chat model, built once per API key."""
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        google_api_key=api_key,
+        temperature=0.2,
+        max_output_tokens=1024,
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_chain(api_key: str):
+    """Return the ``prompt | llm`` runnable, composed once per API key.
+
+    Reusing the same chain keeps the model's HTTP session, and its
+    keep-alive connection, alive across requests.
+    """
+    # New chaining API: use the | operator to create a RunnableSequence
+    return _PROMPT | _get_llm(api_key)
+
+
+@lru_cache(maxsize=1)
+def _get_reduce_chain(api_key: str):
+    """Return the runnable that merges partial summaries into one."""
+    return _REDUCE_PROMPT | _get_llm(api_key)
+
+
+@lru_cache(maxsize=1)
+def _get_embeddings(api_key: str) -> GoogleGenerativeAIEmbeddings:
+    """Return the embedding model used by the semantic cache."""
+    return GoogleGenerativeAIEmbeddings(
+        model="models/text-embedding-004", google_api_key=api_key
+    )
+
+
+def _cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    """Return the cosine similarity of two vectors."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+# Boundaries tried in turn when splitting text, from coarsest to finest
+_SEPARATORS = ("\n\n", "\n", " ")
+
+
+def _split(
+    text: str, max_chars: int = _CHUNK_MAX_CHARS, separators: Sequence[str] = _SEPARATORS
+) -> List[str]:
+    """Split text into chunks of at most ``max_chars`` characters.
+
+    Paragraph boundaries are preferred, then line breaks, then spaces; only
+    a run with none of them is cut into fixed-size pieces.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    if not separators:
+        return [text[start : start + max_chars] for start in range(0, len(text), max_chars)]
+    separator, finer = separators[0], separators[1:]
+    chunks: List[str] = []
+    current = ""
+    for piece in text.split(separator):
+        if len(piece) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split(piece, max_chars, finer))
+        elif current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _content(message) -> str:
+    """Return the text of a message produced by ``ChatGoogleGenerativeAI``."""
+    if hasattr(message, 'content'):
+        return message.content
+    elif isinstance(message, dict) and 'content' in message:
+        return message['content']
+    return str(message)
+
+
+def _map_summaries(chunks: List[str], api_key: str) -> List[str]:
+    """Summarise every chunk concurrently, at most ``_LLM_CONCURRENCY`` at a time.
+
+    The synchronous ``batch`` API is used on purpose: the model's async
+    client is bound to the event loop that first used it, and the cached
+    model outlives any single loop.
+    """
+    results = _get_chain(api_key).batch(
+        [{"text": chunk} for chunk in chunks],
+        config={"max_concurrency": _LLM_CONCURRENCY},
+    )
+    return [_content(result) for result in results]
+
+
+def _embed(text: str, api_key: str) -> Optional[List[float]]:
+    """Return the embedding used for the semantic cache, or ``None`` on failure."""
+    try:
+        return _get_embeddings(api_key).embed_query(text)
+    except Exception:
+        # The semantic cache is an optimisation only; summarise regardless
+        return None
+
+
+def _lookup_summary(digest: str, embedding: Optional[List[float]]) -> Optional[str]:
+    """Return a cached summary for the text, or ``None`` on a miss."""
+    with _CACHE_LOCK:
+        entry = _EXACT_CACHE.get(digest)
+        if entry is not None:
+            stored_at, summary = entry
+            if time.monotonic() - stored_at < _EXACT_CACHE_TTL:
+                _EXACT_CACHE.move_to_end(digest)
+                return summary
+            _EXACT_CACHE.pop(digest, None)
+
+        if embedding is not None:
+            for cached_embedding, cached_summary in _SEMANTIC_CACHE:
+                if _cosine_similarity(embedding, cached_embedding) >= _SIMILARITY_THRESHOLD:
+                    return cached_summary
+    return None
+
+
+def _store_summary(digest: str, embedding: Optional[List[float]], summary: str) -> None:
+    """Record a freshly generated summary in both cache tiers.
+
+    Empty summaries (e.g. when Gemini spends its whole output budget on
+    thinking) are not cached, so the next request asks the model again.
+    """
+    if not summary:
+        return
+    with _CACHE_LOCK:
+        _EXACT_CACHE[digest] = (time.monotonic(), summary)
+        _EXACT_CACHE.move_to_end(digest)
+        while len(_EXACT_CACHE) > _EXACT_CACHE_SIZE:
+            _EXACT_CACHE.popitem(last=False)
+        if embedding is not None:
+            _SEMANTIC_CACHE.append((embedding, summary))
+            del _SEMANTIC_CACHE[:-_SEMANTIC_CACHE_SIZE]
+
+
+def _cache_lookup(
+    text: str, api_key: str
+) -> Tuple[str, Optional[List[float]], Optional[str]]:
+    """Return the text's digest, its embedding and any cached summary."""
+    digest = hashlib.blake2b(text.encode("utf-8")).hexdigest()
+    embedding = None
+    if digest not in _EXACT_CACHE and len(text) <= _EMBED_MAX_CHARS:
+        embedding = _embed(text, api_key)
+    return digest, embedding, _lookup_summary(digest, embedding)
+
+
+def summarize_text(text: str, *, api_key: Optional[str] = None) -> Iterator[str]:
     """Generate a concise summary of the provided text using Gemini 2.5 Flash.
 
-    This function constructs a LangChain `LLMChain` with a prompt template
-    instructing the model to summarise the document.  It then invokes the
-    chain and returns the resulting summary.
+    The text is combined with a prompt template instructing the model to
+    summarise the document and sent to Gemini.  Identical texts are answered
+    from an exact-match cache and, for texts of at most ``_EMBED_MAX_CHARS``
+    characters, near-identical ones (cosine similarity of their embeddings
+    of at least ``_SIMILARITY_THRESHOLD``) from a semantic cache, avoiding
+    the round trip entirely.  Otherwise the summary is
+    yielded piece by piece as Gemini streams it back, so callers can render
+    it progressively.  Texts longer than ``_CHUNK_MAX_CHARS`` are first
+    split into chunks that are summarised concurrently; only the final step
+    combining their summaries is streamed.
+
+    Parameters
+    ----------
+    text : str
+        The text to summarise.
+    api_key : str, optional
+        Explicit Google API key.  If not provided the key is read from the
+        environment.
+
+    Yields
+    ------
+    str
+        Successive fragments of the summary returned by the LLM.
+
+    Raises
+    ------
+    ValueError
+        If no API key is available.
+    """
+    key = _get_api_key(api_key)
+    digest, embedding, cached = _cache_lookup(text, key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = _split(text)
+    if len(chunks) > 1:
+        partials = _map_summaries(chunks, key)
+        chain, text = _get_reduce_chain(key), "\n\n".join(partials)
+    else:
+        chain = _get_chain(key)
+
+    parts: List[str] = []
+    # The input must be a dict matching the prompt variables
+    for chunk in chain.stream({"text": text}):
+        # Each chunk from ChatGoogleGenerativeAI is a message with 'content'
+        content = _content(chunk)
+        if content:
+            parts.append(content)
+            yield content
+    summary = "".join(parts)
+    logger.debug("LLM result: %r", summary)
+    _store_summary(digest, embedding, summary)
+
+
+def summarize_text_sync(text: str, *, api_key: Optional[str] = None) -> str:
+    """Return the complete summary of ``text`` as a single string.
+
+    Convenience wrapper around :func:`summarize_text` for callers that do not
+    render the summary incrementally.
+    """
+    return "".join(summarize_text(text, api_key=api_key))
+
+
+async def summarize_text_async(text: str, *, api_key: Optional[str] = None) -> str:
+    """Asynchronously generate the summary of ``text``.
+
+    Long texts are split with :func:`_split`; the chunks are summarised in
+    parallel and the partial summaries are then combined by a final request.
+    The requests run in a worker thread through the synchronous client, so
+    the cached model is not tied to the caller's event loop.  The same
+    caches as :func:`summarize_text` are used.
 
     Parameters
     ----------
@@ -62,29 +357,18 @@ def summarize_text(text: str, *, api_key: Optional[str] = None) -> str:
         If no API key is available.
     """
     key = _get_api_key(api_key)
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        google_api_key=key,
-        temperature=0.2,
-        max_output_tokens=1024,
-    )
-    prompt = PromptTemplate(
-        input_variables=["text"],
-        template=(
-            "You are a helpful assistant. Read the following document text extracted with OCR "
-            "and provide a concise summary highlighting the main points. Be clear and coherent.\n\n"
-            "Document text extracted with OCR :\n{text}\n\nSummary:"
-        ),
-    )
-    # New chaining API: use the | operator to create a RunnableSequence
-    chain = prompt | llm
-    # The input must be a dict matching the prompt variables
-    result = chain.invoke({"text": text})
-    # The result from ChatGoogleGenerativeAI is an object with 'content'
-    # If you want the plain string:
-    print(f"LLM result: {result!r}")  # Print for server-side logs
-    if hasattr(result, 'content'):
-        return result.content
-    elif isinstance(result, dict) and 'content' in result:
-        return result['content']
-    return str(result)
\ No newline at end of file
+    digest, embedding, cached = await asyncio.to_thread(_cache_lookup, text, key)
+    if cached is not None:
+        return cached
+
+    chunks = _split(text)
+    partials = await asyncio.to_thread(_map_summaries, chunks, key)
+    if len(partials) == 1:
+        summary = partials[0]
+    else:
+        reduced = await asyncio.to_thread(
+            _get_reduce_chain(key).invoke, {"text": "\n\n".join(partials)}
+        )
+        summary = _content(reduced)
+    _store_summary(digest, embedding, summary)
+    return summary
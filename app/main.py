@@ -6,18 +6,49 @@ Flash.  The UI validates file size and type, displays informative error
 messages and exposes a button to trigger the LLM summarisation.
 """
 
+import hashlib
+import logging
 import sys
 import os
+
 import streamlit as st
+from streamlit.runtime.uploaded_file_manager import UploadedFile
 sys.path.append(os.path.dirname(__file__))
-from ocr_utils import extract_text
+from ocr_utils import extract_text, load_backends
 from llm_utils import summarize_text
 
+logger = logging.getLogger(__name__)
+
+
+# Uploads larger than this are rejected
+_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+
+def _hash_upload(uploaded_file: UploadedFile) -> bytes:
+    """Digest an upload's in-memory buffer for Streamlit's cache, without copying it."""
+    return hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).digest()
+
+
+@st.cache_resource(show_spinner=False)
+def _load_backends() -> None:
+    """Import the OCR backends once per server process, not on every rerun."""
+    load_backends()
+
+
+@st.cache_data(
+    max_entries=32,
+    show_spinner=False,
+    hash_funcs={UploadedFile: _hash_upload},
+)
+def _extract_text(file: UploadedFile, filename: str) -> str:
+    """Memoised :func:`extract_text` so reruns do not OCR the same upload again."""
+    return extract_text(file, filename)
 
 
 def main() -> None:
     """Run the Streamlit app."""
     st.set_page_config(page_title="Multimodal Document Analyzer", layout="wide")
+    _load_backends()
     st.title("📄 Multimodal Document Analyzer")
     st.markdown(
         "Upload a PDF, DOCX, JPEG or PNG file.  The application will extract "
@@ -29,18 +60,17 @@ def main() -> None:
     )
 
     if uploaded_file is not None:
-        file_bytes = uploaded_file.read()
         filename = uploaded_file.name
-        # Limit file size to 10 MB
-        max_size = 10 * 1024 * 1024
-        if len(file_bytes) > max_size:
-            st.error("File exceeds maximum allowed size of 10 MB.")
+        # Limit file size to 10 MB; the upload is already held in memory,
+        # so it is passed on as is rather than read into another buffer
+        if uploaded_file.size > _MAX_UPLOAD_SIZE:
+            st.error("File exceeds maximum allowed size of 10 MB.")
             return
 
         # Extract text
         with st.spinner("Extracting text…"):
             try:
-                text = extract_text(file_bytes, filename)
+                text = _extract_text(uploaded_file, filename)
             except Exception as ex:
                 st.error(f"Error extracting text: {ex}")
                 return
@@ -53,12 +83,11 @@ def main() -> None:
         if st.button("Summarize Document"):
             with st.spinner("Generating summary…"):
                 try:
-                    summary = summarize_text(text)
-                    print(f"Summary result: {summary!r}")  # Print for server-side logs
                     st.subheader("Summary")
-                    if summary:
-                        st.write(summary)
-                    else:
+                    # Render tokens as they arrive instead of waiting for the full reply
+                    summary = st.write_stream(summarize_text(text))
+                    logger.debug("Summary result: %r", summary)
+                    if not summary:
                         st.warning("No summary was generated. Please check your Gemini API key or try with another document.")
                 except Exception as ex:
                     st.error(f"Error during summarisation: {ex}")
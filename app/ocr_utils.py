@@ -3,102 +3,489 @@
 This module centralises the OCR logic used by the Streamlit application.  It
 supports images (JPEG/PNG), PDFs and DOCX files.  PDFs are handled first
 with `pdfplumber`, which extracts embedded text directly.  If no text is
-returned for a page (e.g. a scanned document), the page is converted to an
-image and passed to Tesseract OCR.  DOCX files are read using
-`python-docx`/`docx2txt`.  Images are passed directly to Tesseract.  The
+returned for a page (e.g. a scanned document), the page is rendered to an
+image with PyMuPDF and passed to Tesseract OCR.  DOCX files are read in
+memory using `python-docx`.  Images are passed directly to Tesseract.  The
 functions return a string containing all extracted text.
 """
 
 from __future__ import annotations
 
+import asyncio
 import io
+import multiprocessing
 import os
-import tempfile
-from typing import List
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Union
 
-from PIL import Image
-import pytesseract
-import pdfplumber
-import docx2txt
+# Tesseract's OpenMP threading contends for locks and slows individual calls
+# down; we parallelise across pages instead.  This must be set before the
+# engine library is loaded.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
 
-pytesseract.pytesseract.tesseract_cmd = r'PATH_TO_tesseract.exe'
+import numpy as np
+from PIL import Image, ImageOps
 
-try:
-    from pdf2image import convert_from_bytes
-    _PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    # pdf2image is an optional dependency; fallback to plain OCR only when
-    # text extraction fails.
-    _PDF2IMAGE_AVAILABLE = False
+if TYPE_CHECKING:
+    import fitz
+    from tesserocr import PyTessBaseAPI
+
+# Resolution used when rasterising PDF pages for OCR
+_RENDER_DPI = 150
+
+# Fraction of the page an embedded image must cover to be OCR'd directly
+_FULL_PAGE_COVERAGE = 0.9
+
+# Largest width/height handed to Tesseract; bigger images are downscaled
+_MAX_OCR_SIZE = (2000, 2000)
+
+# Tesseract language used when the caller does not request one
+_DEFAULT_LANG = "eng"
+
+# Uploaded content: raw bytes or a seekable binary file object
+FileData = Union[bytes, BinaryIO]
+
+# Per-thread cache of Tesseract engines, keyed by language
+_LOCAL = threading.local()
+
+# Worker pool used to OCR scanned PDF pages, created on first use and shared
+# by every request so each worker keeps its Tesseract engine loaded
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+# Default cap on the number of OCR workers when ``OCR_CONCURRENCY`` is unset
+_MAX_DEFAULT_WORKERS = 4
+
+# Workers are started from a clean server process, never forked from the app
+# (``forkserver`` is unavailable on Windows, where ``spawn`` is the default)
+_POOL_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+# The heavy OCR/PDF libraries are imported on first use, once per process.
+
+@lru_cache(maxsize=1)
+def _get_tesserocr():
+    """Import and return the ``tesserocr`` module."""
+    import tesserocr
+    return tesserocr
+
+
+@lru_cache(maxsize=1)
+def _get_pdfplumber():
+    """Import and return the ``pdfplumber`` module."""
+    import pdfplumber
+    return pdfplumber
+
+
+@lru_cache(maxsize=1)
+def _get_fitz():
+    """Import and return PyMuPDF, or ``None`` if it is not installed.
+
+    PyMuPDF is an optional dependency; it is only needed to render scanned
+    pages for OCR when text extraction fails.
+    """
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return None
+    return fitz
+
+
+@lru_cache(maxsize=1)
+def _get_docx():
+    """Import and return the ``docx`` module from python-docx."""
+    import docx
+    import docx.table
+    return docx
+
+
+def load_backends() -> None:
+    """Import every OCR and document backend ahead of the first request."""
+    _get_tesserocr()
+    _get_pdfplumber()
+    _get_fitz()
+    _get_docx()
+
+
+def _get_api(lang: str | None = None) -> PyTessBaseAPI:
+    """Return this thread's resident Tesseract engine for ``lang``.
+
+    ``PyTessBaseAPI`` loads the trained data once and keeps it in-process, so
+    repeated calls avoid the per-image start-up cost of the ``tesseract``
+    executable.  Engines are not thread-safe, hence one per thread.
+    """
+    apis: Dict[str, PyTessBaseAPI] = getattr(_LOCAL, "apis", None)
+    if apis is None:
+        apis = _LOCAL.apis = {}
+    lang = lang or _DEFAULT_LANG
+    if lang not in apis:
+        apis[lang] = _get_tesserocr().PyTessBaseAPI(lang=lang)
+    return apis[lang]
+
+
+def _iter_docx_blocks(container) -> Iterator[str]:
+    """Yield the text of a python-docx container's paragraphs and tables in order.
+
+    Each table row becomes one line with its cells separated by tabs.  The
+    rows and cells are walked in the XML directly: a cell spanning several
+    columns is a single element, and a cell merged down several rows only
+    contributes its text to the first one.  Nested tables are flattened into
+    their cell's text.
+    """
+    docx = _get_docx()
+    for block in container.iter_inner_content():
+        if isinstance(block, docx.table.Table):
+            for tr in block._tbl.tr_lst:
+                cells = []
+                for tc in tr.tc_lst:
+                    if tc.vMerge == "continue":
+                        cells.append("")
+                        continue
+                    cell = docx.table._Cell(tc, block)
+                    cells.append("\n".join(_iter_docx_blocks(cell)))
+                yield "\t".join(cells)
+        else:
+            yield block.text
+
+
+def _extract_text_from_docx(file_data: FileData) -> str:
+    """Extract the text of a DOCX file, including tables, headers and footers.
+
+    Headers come first, then the body in document order, then footers.
+    Headers and footers that a section inherits from the previous one are
+    not repeated.
+    """
+    document = _get_docx().Document(_as_stream(file_data))
+    headers: List[str] = []
+    footers: List[str] = []
+    for section in document.sections:
+        if not section.header.is_linked_to_previous:
+            headers.extend(_iter_docx_blocks(section.header))
+        if not section.footer.is_linked_to_previous:
+            footers.extend(_iter_docx_blocks(section.footer))
+    return "\n".join([*headers, *_iter_docx_blocks(document), *footers])
+
+
+def _as_stream(file_data: FileData) -> BinaryIO:
+    """Return a binary file object positioned at the start of ``file_data``."""
+    if isinstance(file_data, (bytes, bytearray)):
+        return io.BytesIO(file_data)
+    file_data.seek(0)
+    return file_data
+
+
+def _as_bytes(file_data: FileData) -> bytes:
+    """Return the full contents of ``file_data`` as bytes."""
+    if isinstance(file_data, (bytes, bytearray)):
+        return bytes(file_data)
+    if isinstance(file_data, io.BytesIO):
+        # Shares the buffer until either side is modified
+        return file_data.getvalue()
+    file_data.seek(0)
+    return file_data.read()
+
+
+def _otsu_threshold(image: Image.Image) -> int:
+    """Return the Otsu binarisation threshold of a greyscale image."""
+    hist, _ = np.histogram(np.asarray(image), bins=256, range=(0, 256))
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_bg[-1] - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.nanargmax(between)) if np.isfinite(between).any() else 127
+
+
+def _preprocess(image: Image.Image) -> Image.Image:
+    """Prepare an image for Tesseract.
+
+    Transparent images are first flattened onto white, so that transparent
+    pixels (usually stored as black) do not swallow dark text.  The image is
+    then converted to greyscale, its resolution capped at
+    ``_MAX_OCR_SIZE``, its contrast stretched and finally binarised with an
+    Otsu threshold, which considerably reduces the amount of data Tesseract
+    has to classify.
+    """
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image)
+    image = image.convert("L")
+    image.thumbnail(_MAX_OCR_SIZE)
+    image = ImageOps.autocontrast(image)
+    threshold = _otsu_threshold(image)
+    return image.point([255 if p > threshold else 0 for p in range(256)], mode="1")
 
 
 def _ocr_image(image: Image.Image, lang: str | None = None) -> str:
     """Run Tesseract OCR on a PIL Image.
 
+    The image is preprocessed with :func:`_preprocess` before recognition.
+
     Parameters
     ----------
     image : PIL.Image.Image
         The image to process.
     lang : str, optional
-        Language code for Tesseract (e.g. ``'eng'``).  If ``None`` the
-        default language installed with Tesseract is used.
+        Language code for Tesseract (e.g. ``'eng'``).  If ``None`` English
+        is used.
 
     Returns
     -------
     str
         The recognised text.
     """
-    config = ""
-    if lang:
-        config += f" -l {lang}"
-    return pytesseract.image_to_string(image, config=config)
+    api = _get_api(lang)
+    api.SetImage(_preprocess(image))
+    return api.GetUTF8Text()
+
+
+def _render_page(page: "fitz.Page", dpi: int = _RENDER_DPI) -> Image.Image:
+    """Rasterise a PyMuPDF page into a greyscale PIL Image without temporary files."""
+    pix = page.get_pixmap(dpi=dpi, colorspace=_get_fitz().csGRAY)
+    return Image.frombytes("L", (pix.width, pix.height), pix.samples)
 
 
-def _extract_text_from_pdf_bytes(file_bytes: bytes) -> str:
+def _is_upright(matrix: "fitz.Matrix") -> bool:
+    """Return whether an image placement matrix neither rotates nor flips."""
+    return matrix.b == 0 and matrix.c == 0 and matrix.a > 0 and matrix.d > 0
+
+
+def _page_image(doc: "fitz.Document", page: "fitz.Page") -> Image.Image:
+    """Return the image to OCR for a scanned PDF page.
+
+    Camera scans usually embed exactly one image covering the whole page; in
+    that case the original image is decoded directly, which is much cheaper
+    than rasterising the page.  Anything else (several images, rotated pages
+    or images placed rotated or flipped, formats PIL cannot read) falls back
+    to :func:`_render_page`.
+    """
+    images = page.get_images(full=True)
+    if len(images) == 1 and page.rotation == 0:
+        xref = images[0][0]
+        try:
+            placements = page.get_image_rects(xref, transform=True)
+            page_area = page.rect.width * page.rect.height
+            if len(placements) == 1:
+                rect, matrix = placements[0]
+                if _is_upright(matrix) and rect.width * rect.height >= _FULL_PAGE_COVERAGE * page_area:
+                    info = doc.extract_image(xref)
+                    if info:
+                        image = Image.open(io.BytesIO(info["image"]))
+                        image.load()
+                        return image
+        except (OSError, Image.DecompressionBombError, ValueError):
+            # Undecodable image or unusable placement: rasterise the page
+            pass
+    return _render_page(page)
+
+
+def _page_text(page) -> str:
+    """Return a pdfplumber page's embedded text and release its caches.
+
+    Pages without any character objects (pure images) are skipped without
+    running pdfplumber's text reconstruction.
+    """
+    try:
+        return (page.extract_text() or "") if page.chars else ""
+    finally:
+        # ``Page.close`` only exists from pdfplumber 0.10.4; ``flush_cache``
+        # releases the same cached objects on every supported version
+        page.flush_cache()
+
+
+def _iter_page_texts(file_data: FileData) -> Iterator[str]:
+    """Yield the embedded text of each PDF page, one page at a time.
+
+    Each page's cached layout objects are released as soon as its text has
+    been extracted so peak memory stays bounded on long documents.  The first
+    and last pages are probed up front: if neither has any text and OCR is
+    available (PyMuPDF installed), the document is treated as scanned and an
+    empty string is yielded for every page without parsing the remaining
+    ones.  Without PyMuPDF every page is extracted, since OCR cannot recover
+    the text of any page that is skipped.
+    """
+    with _get_pdfplumber().open(_as_stream(file_data)) as pdf:
+        pages = pdf.pages
+        if not pages:
+            return
+        first = _page_text(pages[0])
+        last = _page_text(pages[-1]) if len(pages) > 1 else first
+        if first.strip() == "" and last.strip() == "" and _get_fitz() is not None:
+            # Image-only document: everything goes to OCR
+            for _ in pages:
+                yield ""
+            return
+        yield first
+        for page in pages[1:-1]:
+            yield _page_text(page)
+        if len(pages) > 1:
+            yield last
+
+
+def _pool_size() -> int:
+    """Return the number of OCR worker processes (``OCR_CONCURRENCY``).
+
+    The default is the number of CPUs this process may run on, capped at
+    ``_MAX_DEFAULT_WORKERS``: inside a container ``os.cpu_count()`` reports
+    the host's cores rather than the container's limit.
+    """
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        available = os.cpu_count() or 1
+    default = min(available, _MAX_DEFAULT_WORKERS)
+    return max(int(os.getenv("OCR_CONCURRENCY", default)), 1)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Return the shared OCR process pool, creating it on first use.
+
+    Workers are started once per server process rather than per document.
+    They are not forked from the server: forking a process that is running
+    Streamlit's threads can copy a lock held by another thread into the
+    child and deadlock it.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(
+                max_workers=_pool_size(),
+                mp_context=multiprocessing.get_context(_POOL_START_METHOD),
+            )
+        return _POOL
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next request starts a fresh one."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_and_ocr_block(
+    pdf_bytes: bytes, page_nums: List[int], lang: str | None = None
+) -> List[str]:
+    """Render and OCR a block of PDF pages; runs inside a worker process.
+
+    The worker opens the document itself, so only the raw bytes and page
+    numbers cross the process boundary and rendering happens outside the
+    parent's GIL.  Pages are processed one at a time to bound memory, using
+    their embedded scan where possible (see :func:`_page_image`).
+    """
+    with _get_fitz().open(stream=pdf_bytes, filetype="pdf") as doc:
+        return [_ocr_image(_page_image(doc, doc.load_page(n)), lang=lang) for n in page_nums]
+
+
+async def _extract_text_from_pdf_bytes_async(
+    file_data: FileData, *, lang: str | None = None
+) -> str:
+    """Extract text from a PDF, running the OCR fallback concurrently.
+
+    Text is first collected from every page with ``pdfplumber``.  Pages that
+    return no text are partitioned into contiguous blocks, one per worker of
+    a shared process pool of ``OCR_CONCURRENCY`` workers (default: the
+    available CPUs, at most four).  Each worker renders its block with PyMuPDF and
+    OCRs it with its own long-lived, single-threaded Tesseract engine; the
+    blocks are awaited together with :func:`asyncio.gather`.  A single
+    fallback page is OCR'd in-process instead.
+
+    Parameters
+    ----------
+    file_data : bytes or binary file object
+        The PDF file.
+    lang : str, optional
+        Language code to pass to Tesseract for OCR.
+
+    Returns
+    -------
+    str
+        The concatenated text from all pages.
+    """
+    texts: List[str] = list(_iter_page_texts(file_data))
+    # If pdfplumber returns no text we fall back to OCR
+    fallback = [
+        page_num for page_num, page_text in enumerate(texts) if page_text.strip() == ""
+    ]
+    if fallback and _get_fitz() is not None:
+        # Only the OCR workers need the document as bytes
+        pdf_bytes = _as_bytes(file_data)
+        if len(fallback) == 1:
+            # Not worth a round trip through the pool
+            ocr_texts = _render_and_ocr_block(pdf_bytes, fallback, lang)
+        else:
+            block_size = -(-len(fallback) // min(_pool_size(), len(fallback)))
+            blocks = [
+                fallback[start : start + block_size]
+                for start in range(0, len(fallback), block_size)
+            ]
+            loop = asyncio.get_running_loop()
+            pool = _get_pool()
+            try:
+                results = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(pool, _render_and_ocr_block, pdf_bytes, block, lang)
+                        for block in blocks
+                    )
+                )
+            except BrokenProcessPool:
+                _discard_pool(pool)
+                raise
+            ocr_texts = [page_text for block_texts in results for page_text in block_texts]
+        for page_num, page_text in zip(fallback, ocr_texts):
+            texts[page_num] += page_text
+
+    return "".join(page_text + "\n" for page_text in texts)
+
+
+def _extract_text_from_pdf_bytes(file_data: FileData, *, lang: str | None = None) -> str:
     """Extract text from a PDF using pdfplumber and optional OCR fallback.
 
     This function first attempts to extract text from each page using
     ``pdfplumber``.  If a page returns ``None`` or an empty string, it will
-    attempt to run OCR on that page provided ``pdf2image`` is installed.
+    attempt to run OCR on that page provided ``PyMuPDF`` is installed.  It
+    is a thin synchronous wrapper around
+    :func:`_extract_text_from_pdf_bytes_async`.
 
     Parameters
     ----------
-    file_bytes : bytes
-        The raw bytes of the PDF file.
+    file_data : bytes or binary file object
+        The PDF file.
+    lang : str, optional
+        Language code to pass to Tesseract for OCR.
 
     Returns
     -------
     str
         The concatenated text from all pages.
     """
-    text = ""
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            page_text = page.extract_text() or ""
-            # If pdfplumber returns no text we fall back to OCR
-            if page_text.strip() == "" and _PDF2IMAGE_AVAILABLE:
-                # Convert just this page to an image
-                images: List[Image.Image] = convert_from_bytes(
-                    file_bytes, first_page=page_num + 1, last_page=page_num + 1
-                )
-                for img in images:
-                    page_text += _ocr_image(img)
-            text += page_text + "\n"
-    return text
+    return asyncio.run(_extract_text_from_pdf_bytes_async(file_data, lang=lang))
 
 
-def extract_text(file_bytes: bytes, filename: str, *, lang: str | None = None) -> str:
+def extract_text(file_data: FileData, filename: str, *, lang: str | None = None) -> str:
     """Determine the file type and extract its text accordingly.
 
     Parameters
     ----------
-    file_bytes : bytes
-        The raw bytes of the uploaded file.
+    file_data : bytes or binary file object
+        The raw bytes of the uploaded file, or a seekable file object holding
+        them, such as Streamlit's ``UploadedFile``.  File objects are read in
+        place without copying them into another buffer first.
     filename : str
         The name of the file (used to infer the extension).
     lang : str, optional
-        Language code to pass to Tesseract for OCR.  Default is ``None`` (let
-        Tesseract use its default language).
+        Language code to pass to Tesseract for OCR.  Default is ``None``,
+        which uses English (``'eng'``).
 
     Returns
     -------
@@ -111,20 +498,16 @@ def extract_text(file_bytes: bytes, filename: str, *, lang: str | None = None) -
 
     if ext in {".png", ".jpg", ".jpeg"}:
         # Direct image OCR
-        image = Image.open(io.BytesIO(file_bytes))
+        image = Image.open(_as_stream(file_data))
         return _ocr_image(image, lang=lang)
     elif ext == ".pdf":
-        return _extract_text_from_pdf_bytes(file_bytes)
+        return _extract_text_from_pdf_bytes(file_data, lang=lang)
     elif ext == ".docx":
-        # Write to a temporary file because docx2txt expects a file path
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-            tmp.write(file_bytes)
-            tmp.flush()
-            text = docx2txt.process(tmp.name)
-        return text
+        # python-docx reads file-like objects, so no temporary file is needed
+        return _extract_text_from_docx(file_data)
     else:
         # As a last resort, try to decode as UTF‑8 text; if that fails, raise
         try:
-            return file_bytes.decode("utf-8")
+            return _as_bytes(file_data).decode("utf-8")
         except Exception:
             raise ValueError(f"Unsupported file format: {ext}")
\ No newline at end of file
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessageChunk
+
+from app import llm_utils
+
+
+class _LoopBoundChatModel(FakeListChatModel):
+    """Fake chat model whose async client, like Gemini's, sticks to one loop."""
+
+    async def ainvoke(self, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        bound = _BOUND_LOOPS.setdefault(id(self), loop)
+        if bound is not loop:
+            raise RuntimeError("attached to a different loop")
+        return await super().ainvoke(*args, **kwargs)
+
+
+_BOUND_LOOPS = {}
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm = _LoopBoundChatModel(responses=["partial"])
+    cached_chains = (llm_utils._get_chain, llm_utils._get_reduce_chain)
+    monkeypatch.setattr(llm_utils, "_get_llm", lambda api_key: llm)
+    for cached in cached_chains:
+        cached.cache_clear()
+    llm_utils._EXACT_CACHE.clear()
+    yield llm
+    for cached in cached_chains:
+        cached.cache_clear()
+    llm_utils._EXACT_CACHE.clear()
+
+
+def _long_text(word: str) -> str:
+    return "\n".join(f"{word} line {i}" for i in range(3 * llm_utils._CHUNK_MAX_CHARS // 10))
+
+
+def test_summarises_two_long_texts_in_a_row(fake_llm):
+    for word in ("alpha", "beta"):
+        text = _long_text(word)
+        assert len(llm_utils._split(text)) > 1
+        assert llm_utils.summarize_text_sync(text, api_key="key") == "partial"
+
+
+def test_async_summarises_two_long_texts_in_a_row(fake_llm):
+    for word in ("alpha", "beta"):
+        summary = asyncio.run(llm_utils.summarize_text_async(_long_text(word), api_key="key"))
+        assert summary == "partial"
+
+
+def test_split_prefers_line_breaks_over_hard_cuts():
+    text = "\n".join(f"line {i} of a pdfplumber page" for i in range(1000))
+    chunks = llm_utils._split(text, max_chars=500)
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert "\n".join(chunks) == text
+
+
+def test_split_falls_back_to_words_then_hard_cuts():
+    words = " ".join(["word"] * 300)
+    chunks = llm_utils._split(words, max_chars=50)
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks) == words
+    assert llm_utils._split("x" * 120, max_chars=50) == ["x" * 50, "x" * 50, "x" * 20]
+
+
+class _ScriptedChain:
+    """Fake chain replying with one scripted string per call."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def stream(self, inputs):
+        reply = self.replies[self.calls]
+        self.calls += 1
+        yield AIMessageChunk(content=reply)
+
+
+def test_empty_summary_is_not_cached(fake_llm, monkeypatch):
+    chain = _ScriptedChain(["", "real summary"])
+    monkeypatch.setattr(llm_utils, "_get_chain", lambda api_key: chain)
+    monkeypatch.setattr(llm_utils, "_embed", lambda text, api_key: None)
+
+    assert llm_utils.summarize_text_sync("short doc", api_key="key") == ""
+    assert llm_utils.summarize_text_sync("short doc", api_key="key") == "real summary"
+    assert chain.calls == 2
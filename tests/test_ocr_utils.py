@@ -0,0 +1,92 @@
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app import ocr_utils
+
+
+def test_preprocess_flattens_transparency_onto_white():
+    image = Image.new("RGBA", (200, 100), (0, 0, 0, 0))
+    ImageDraw.Draw(image).rectangle((50, 40, 150, 60), fill=(0, 0, 0, 255))
+
+    result = ocr_utils._preprocess(image)
+
+    assert result.mode == "1"
+    assert result.getpixel((10, 10)) == 255
+    assert result.getpixel((100, 50)) == 0
+
+
+def _scanned_pdf(rotate: int = 0) -> bytes:
+    fitz = pytest.importorskip("fitz")
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 800), (255, 255, 255)).save(buffer, format="JPEG")
+    doc = fitz.open()
+    page = doc.new_page(width=300, height=400)
+    page.insert_image(page.rect, stream=buffer.getvalue(), rotate=rotate)
+    return doc.tobytes()
+
+
+def test_page_image_uses_embedded_scan_when_upright():
+    fitz = pytest.importorskip("fitz")
+    with fitz.open(stream=_scanned_pdf(), filetype="pdf") as doc:
+        image = ocr_utils._page_image(doc, doc.load_page(0))
+    assert image.format == "JPEG"
+    assert image.size == (600, 800)
+
+
+def test_page_image_renders_page_when_scan_is_placed_rotated():
+    fitz = pytest.importorskip("fitz")
+    with fitz.open(stream=_scanned_pdf(rotate=180), filetype="pdf") as doc:
+        image = ocr_utils._page_image(doc, doc.load_page(0))
+    assert image.format is None
+    assert image.mode == "L"
+
+
+def test_docx_text_includes_tables_headers_and_footers():
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_paragraph("Invoice")
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Item"
+    table.cell(0, 1).text = "Price"
+    table.cell(1, 0).text = "Widget"
+    table.cell(1, 1).text = "9.99"
+    document.sections[0].header.paragraphs[0].text = "ACME"
+    document.sections[0].footer.paragraphs[0].text = "Page 1"
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    text = ocr_utils.extract_text(buffer.getvalue(), "invoice.docx")
+
+    assert text == "ACME\nInvoice\nItem\tPrice\nWidget\t9.99\nPage 1"
+
+
+def test_docx_vertically_merged_cell_text_appears_once():
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    table = document.add_table(rows=3, cols=2)
+    table.cell(0, 0).merge(table.cell(2, 0)).text = "Merged"
+    for row in range(3):
+        table.cell(row, 1).text = f"r{row}"
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    text = ocr_utils.extract_text(buffer.getvalue(), "merged.docx")
+
+    assert text == "Merged\tr0\n\tr1\n\tr2"
+
+
+def test_pdf_without_pymupdf_keeps_text_between_scanned_pages(monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    pytest.importorskip("pdfplumber")
+    doc = fitz.open()
+    doc.new_page()
+    doc.new_page().insert_text((72, 72), "embedded text")
+    doc.new_page()
+    pdf_bytes = doc.tobytes()
+    monkeypatch.setattr(ocr_utils, "_get_fitz", lambda: None)
+
+    text = ocr_utils.extract_text(pdf_bytes, "mixed.pdf")
+
+    assert text == "\nembedded text\n\n"